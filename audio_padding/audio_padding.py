@@ -5,21 +5,12 @@ import logging
 import subprocess
 import shutil
 from pathlib import Path
-from datetime import datetime
 
-# 配置日志
-log_dir = Path(__file__).parent / "logs"
-log_dir.mkdir(exist_ok=True)
-log_file = log_dir / f"audio_padding_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+if __name__ == "__main__":
+    # 直接运行脚本时，将仓库根目录加入搜索路径以便导入 marks_common
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+from marks_common.logging_setup import setup_logging, log_event
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 def get_audio_duration(file_path):
@@ -35,20 +26,30 @@ def get_audio_duration(file_path):
         result = subprocess.run(cmd, capture_output=True, text=True)
         return float(result.stdout.strip())
     except Exception as e:
-        logger.error(f"获取音频时长失败 {file_path}: {str(e)}")
+        # 失败原因只在调试时输出，调用方会记录一条 failed 事件
+        logger.debug(f"获取音频时长失败 {file_path}: {str(e)}")
         return None
 
 def process_audio_file(input_file, target_duration=3.1):
     """处理单个音频文件"""
+    start_time = time.perf_counter()
+
+    def _done(message, outcome, level=logging.INFO, **fields):
+        """记录本文件的处理结果"""
+        log_event(logger, message, file=input_file, stage="padding",
+                  duration=time.perf_counter() - start_time, outcome=outcome,
+                  level=level, **fields)
+
     try:
         # 获取当前音频时长
         current_duration = get_audio_duration(input_file)
         if current_duration is None:
+            _done(f"跳过无法读取时长的文件 {input_file}", "failed", level=logging.ERROR)
             return False
         
         # 如果音频时长已经大于等于目标时长，跳过处理
         if current_duration >= target_duration:
-            logger.info(f"文件 {input_file} 时长 {current_duration:.2f}秒，无需处理")
+            _done(f"文件 {input_file} 时长 {current_duration:.2f}秒，无需处理", "skipped")
             return True
         
         # 计算需要添加的静音时长
@@ -77,7 +78,8 @@ def process_audio_file(input_file, target_duration=3.1):
             try:
                 # 尝试覆盖原文件
                 shutil.move(temp_file, input_file)
-                logger.info(f"成功处理文件 {input_file}，时长从 {current_duration:.2f}秒 增加到 {target_duration:.2f}秒")
+                _done(f"成功处理文件 {input_file}，时长从 {current_duration:.2f}秒 增加到 {target_duration:.2f}秒",
+                      "success", retries=retry_count)
                 return True
             except (PermissionError, OSError, IOError) as e:
                 retry_count += 1
@@ -87,17 +89,18 @@ def process_audio_file(input_file, target_duration=3.1):
                 logger.info(f"等待 {retry_delay} 秒后重试...")
                 
                 if retry_count >= max_retries:
-                    logger.error(f"无法覆盖文件 {input_file}，已达到最大重试次数")
+                    _done(f"无法覆盖文件 {input_file}，已达到最大重试次数",
+                          "failed", level=logging.ERROR, retries=retry_count)
                     return False
                     
                 time.sleep(retry_delay)
                 continue
             except Exception as e:
-                logger.error(f"处理文件 {input_file} 时发生未知错误: {str(e)}")
+                _done(f"处理文件 {input_file} 时发生未知错误: {str(e)}", "failed", level=logging.ERROR)
                 return False
                 
     except Exception as e:
-        logger.error(f"处理文件 {input_file} 时发生错误: {str(e)}")
+        _done(f"处理文件 {input_file} 时发生错误: {str(e)}", "failed", level=logging.ERROR)
         return False
 
 def process_directory(directory_path):
@@ -153,6 +156,8 @@ def get_input_directory():
         return directory_path
 
 def main():
+    setup_logging("audio_padding", Path(__file__).parent / "logs")
+
     print("=" * 50)
     print("音频文件静音填充工具")
     print("=" * 50)
@@ -4,21 +4,12 @@ import time
 import logging
 import subprocess
 from pathlib import Path
-from datetime import datetime
 
-# 配置日志
-log_dir = Path(__file__).parent / "logs"
-log_dir.mkdir(exist_ok=True)
-log_file = log_dir / f"batch_inference_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+if __name__ == "__main__":
+    # 直接运行脚本时，将仓库根目录加入搜索路径以便导入 marks_common
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+from marks_common.logging_setup import setup_logging, log_event
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 # 模型路径配置
@@ -80,6 +71,48 @@ def extract_text_from_filename(filename):
         return parts[-1]
     return filename
 
+def build_inference_cmd(text, ref_file, ref_text, output_file,
+                        gpt_model_path=GPT_MODEL_PATH, sovits_model_path=SOVITS_MODEL_PATH):
+    """构建推理命令"""
+    return [
+        sys.executable,
+        'GPT_SoVITS/inference.py',
+        '--text', text,
+        '--reference_audio', str(ref_file),
+        '--reference_text', ref_text,
+        '--language', 'ja',
+        '--gpt_model_path', gpt_model_path,
+        '--sovits_model_path', sovits_model_path,
+        '--output_path', str(output_file),
+        '--steps', '32',
+        '--speed', '1',
+        '--pause_time', '0.3',
+        '--top_k', '15',
+        '--top_p', '1',
+        '--temperature', '1'
+    ]
+
+def synthesize(text, ref_file, ref_text, output_file,
+               gpt_model_path=GPT_MODEL_PATH, sovits_model_path=SOVITS_MODEL_PATH, cwd=None):
+    """
+    合成单个音频文件，成功返回True
+    :param cwd: GPT-SoVITS 根目录，推理脚本与相对模型路径都相对于该目录；默认为当前目录
+    """
+    cmd = build_inference_cmd(text, ref_file, ref_text, output_file,
+                              gpt_model_path, sovits_model_path)
+    start_time = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True, cwd=cwd)
+    duration = time.perf_counter() - start_time
+    
+    if result.returncode == 0:
+        log_event(logger, f"成功处理: {text} ({Path(output_file).name})",
+                  file=output_file, stage="synthesis", duration=duration, outcome="success")
+        return True
+    log_event(logger, f"处理失败: {text} ({Path(output_file).name})\n错误信息: {result.stderr}",
+              file=output_file, stage="synthesis", duration=duration, outcome="failed",
+              level=logging.ERROR)
+    return False
+
 def process_tts(text_file, reference_dir):
     """处理TTS合成"""
     try:
@@ -110,32 +143,8 @@ def process_tts(text_file, reference_dir):
                 current_file += 1
                 output_file = output_dir / f"{ref_file.stem}{suffix}.wav"
                 
-                # 构建推理命令
-                cmd = [
-                    'python',
-                    'GPT_SoVITS/inference.py',
-                    '--text', text,
-                    '--reference_audio', str(ref_file),
-                    '--reference_text', ref_text,
-                    '--language', 'ja',
-                    '--gpt_model_path', GPT_MODEL_PATH,
-                    '--sovits_model_path', SOVITS_MODEL_PATH,
-                    '--output_path', str(output_file),
-                    '--steps', '32',
-                    '--speed', '1',
-                    '--pause_time', '0.3',
-                    '--top_k', '15',
-                    '--top_p', '1',
-                    '--temperature', '1'
-                ]
-                
                 logger.info(f"正在处理 [{current_file}/{total_files}]: {text} (版本{suffix})")
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    logger.info(f"成功处理: {text} (版本{suffix})")
-                else:
-                    logger.error(f"处理失败: {text} (版本{suffix})\n错误信息: {result.stderr}")
+                synthesize(text, ref_file, ref_text, output_file)
                 
                 # 添加短暂延迟，避免系统负载过高
                 time.sleep(0.5)
@@ -144,6 +153,8 @@ def process_tts(text_file, reference_dir):
         logger.error(f"处理过程中发生错误: {str(e)}")
 
 def main():
+    setup_logging("batch_inference", Path(__file__).parent / "logs")
+
     print("=" * 50)
     print("GPT-SoVITS 批量TTS推理工具")
     print("=" * 50)
@@ -1,47 +1,66 @@
 import os
 import sys
 
-def generate_list(audio_dir):
+# 支持的音频格式
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.flac')
+
+def get_list_output_dir():
+    """获取list文件输出目录（GPT-SoVITS 的 output/asr_opt）"""
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "output", "asr_opt")
+
+def extract_text(filename):
+    """从文件名中提取文本（最后一个下划线后的内容）"""
+    # 获取文件名(不含后缀)
+    filename_no_ext = os.path.splitext(filename)[0]
+    # 从后往前找到第一个下划线的位置
+    last_underscore_index = filename_no_ext.rfind('_')
+    if last_underscore_index != -1:
+        # 提取最后一个下划线后的内容作为文本
+        return filename_no_ext[last_underscore_index + 1:]
+    # 如果没有下划线，则使用整个文件名
+    return filename_no_ext
+
+def make_list_line(file_path, speaker_name):
+    """生成单个音频文件对应的list行，使用ja作为语言标记"""
+    text = extract_text(os.path.basename(file_path))
+    return f"{file_path}|{speaker_name}|JA|{text}"
+
+def list_audio_files(audio_dir):
+    """获取目录中所有支持格式的音频文件名（按名称排序）"""
+    return sorted(filename for filename in os.listdir(audio_dir) if filename.endswith(AUDIO_EXTENSIONS))
+
+def write_list(audio_dir, output_dir):
     """
-    生成list文件
+    将目录中的音频写入list文件
     :param audio_dir: 音频文件目录
+    :param output_dir: list文件输出目录
+    :return: (list文件路径, 音频文件数量)
     """
-    # 确保输出目录存在
-    output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "output", "asr_opt")
     os.makedirs(output_dir, exist_ok=True)
     
     # 获取音频目录的文件夹名作为说话人名称
-    speaker_name = os.path.basename(audio_dir)
+    speaker_name = os.path.basename(os.path.normpath(audio_dir))
     
-    # 准备输出内容
-    output_lines = []
-    
-    # 遍历音频文件
-    for filename in os.listdir(audio_dir):
-        if filename.endswith(('.wav', '.mp3', '.flac')):  # 支持的音频格式
-            # 获取完整路径
-            file_path = os.path.join(audio_dir, filename)
-            # 获取文件名(不含后缀)
-            filename_no_ext = os.path.splitext(filename)[0]
-            # 从后往前找到第一个下划线的位置
-            last_underscore_index = filename_no_ext.rfind('_')
-            if last_underscore_index != -1:
-                # 提取最后一个下划线后的内容作为文本
-                text = filename_no_ext[last_underscore_index + 1:]
-            else:
-                # 如果没有下划线，则使用整个文件名
-                text = filename_no_ext
-            # 组合成list格式，使用ja作为语言标记
-            line = f"{file_path}|{speaker_name}|JA|{text}"
-            output_lines.append(line)
+    output_lines = [
+        make_list_line(os.path.join(audio_dir, filename), speaker_name)
+        for filename in list_audio_files(audio_dir)
+    ]
     
     # 写入文件
     output_file = os.path.join(output_dir, f"{speaker_name}.list")
     with open(output_file, "w", encoding="utf-8") as f:
         f.write("\n".join(output_lines))
+    return output_file, len(output_lines)
+
+def generate_list(audio_dir):
+    """
+    生成list文件
+    :param audio_dir: 音频文件目录
+    """
+    output_file, count = write_list(audio_dir, get_list_output_dir())
     
     print(f"已生成list文件: {output_file}")
-    print(f"共处理 {len(output_lines)} 个音频文件")
+    print(f"共处理 {count} 个音频文件")
 
 if __name__ == "__main__":
     print("\n=== GPT-SoVITS 音频列表生成工具 ===")
@@ -0,0 +1,139 @@
+import copy
+import json
+import atexit
+import logging
+import logging.handlers
+import queue
+from pathlib import Path
+from datetime import datetime
+
+# 文本格式（控制台）
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# 单个日志文件最大字节数及轮转份数
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+# 每个工具最多保留的历史日志文件数
+DEFAULT_KEEP_RUNS = 20
+
+_listener = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """将日志记录格式化为一行JSON，便于后续汇总统计"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        event = getattr(record, 'event', None)
+        if event:
+            entry.update(event)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    入队前只合并消息参数，异常堆栈单独保存在 exc_text 中
+    默认的 prepare 会把堆栈拼进 message 并清空 exc_info/exc_text
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.message = record.msg
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def prune_logs(log_dir, tool_name, keep=DEFAULT_KEEP_RUNS):
+    """删除旧的日志文件，只保留最近 keep 次运行的日志"""
+    log_dir = Path(log_dir)
+    if not log_dir.exists():
+        return
+    # 文件名中带有时间戳，按名称排序即按时间排序
+    runs = sorted(log_dir.glob(f"{tool_name}_*.log"))
+    for old in runs[:max(len(runs) - keep, 0)]:
+        for path in [old, *old.parent.glob(old.name + '.*')]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def setup_logging(tool_name, log_dir, level=logging.INFO,
+                  max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                  keep_runs=DEFAULT_KEEP_RUNS):
+    """
+    配置日志（只应在入口函数中调用）
+    日志经由队列交给后台线程写入，文件为按大小轮转的JSON Lines格式
+    :param tool_name: 工具名称，用作日志文件名前缀
+    :param log_dir: 日志目录
+    :return: 本次运行的日志文件路径
+    """
+    global _listener
+    if _listener is not None:
+        shutdown_logging()
+
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    prune_logs(log_dir, tool_name, keep=max(keep_runs - 1, 0))
+    log_file = log_dir / f"{tool_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+    file_handler.setFormatter(JsonLinesFormatter())
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(StructuredQueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return log_file
+
+
+def shutdown_logging():
+    """停止后台写日志线程，并刷新剩余的日志"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def log_event(logger, message, *, file=None, stage=None, duration=None,
+              outcome=None, level=logging.INFO, **fields):
+    """
+    记录一条结构化事件
+    :param file: 处理的文件
+    :param stage: 处理阶段
+    :param duration: 耗时（秒）
+    :param outcome: 处理结果，如 success / skipped / failed
+    """
+    event = {'file': str(file) if file is not None else None, 'stage': stage,
+             'duration': round(duration, 4) if duration is not None else None,
+             'outcome': outcome}
+    event.update(fields)
+    logger.log(level, message, extra={'event': event})
+
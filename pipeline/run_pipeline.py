@@ -0,0 +1,355 @@
+import sys
+import json
+import time
+import queue
+import shutil
+import logging
+import threading
+from pathlib import Path
+
+if __name__ == "__main__":
+    # 直接运行脚本时，将仓库根目录加入搜索路径以便导入 marks_common
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+from marks_common.logging_setup import setup_logging, shutdown_logging, log_event
+from create_lists import generate_list
+from batch_inference import batch_inference
+from audio_padding import audio_padding
+
+logger = logging.getLogger(__name__)
+
+# 队列结束标记
+_STOP = object()
+
+# 默认配置，配置文件中的同名项会覆盖这些值
+DEFAULT_CONFIG = {
+    'reference_dir': None,
+    'text_file': None,
+    'gpt_sovits_root': None,
+    'work_dir': str(Path(__file__).parent / "work"),
+    'export_dir': str(Path(__file__).parent / "export"),
+    'selected_dir': None,
+    'list_dir': None,
+    'gpt_model_path': None,
+    'sovits_model_path': None,
+    'target_duration': 3.1,
+    'selection_file': None,
+    'queue_size': 8,
+    'stages': {
+        'synthesis': {'concurrency': 1},
+        'padding': {'concurrency': 4},
+        'export': {'concurrency': 2},
+    },
+}
+
+
+class Stage:
+    """流水线中的一个阶段，func 处理单个条目，返回交给下一阶段的条目，返回 None 表示失败"""
+
+    def __init__(self, name, func, concurrency=1):
+        self.name = name
+        self.func = func
+        self.concurrency = max(int(concurrency), 1)
+        self.processed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self.first_start = None
+        self.last_end = None
+        self._lock = threading.Lock()
+
+    def record(self, start, end, ok):
+        """记录单个条目的处理耗时"""
+        with self._lock:
+            self.processed += 1
+            if not ok:
+                self.failed += 1
+            self.busy_time += end - start
+            if self.first_start is None or start < self.first_start:
+                self.first_start = start
+            if self.last_end is None or end > self.last_end:
+                self.last_end = end
+
+    def record_failure(self):
+        """记录一次不对应具体条目的失败（如数据源中断）"""
+        with self._lock:
+            self.failed += 1
+
+    @property
+    def wall_time(self):
+        if self.first_start is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+
+def _run_source(source, stage, out_queue, consumers):
+    """运行数据源阶段，将产生的条目放入第一个队列"""
+    try:
+        iterator = iter(source())
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            stage.record(start, time.perf_counter(), True)
+            out_queue.put(item)
+    except Exception as e:
+        logger.error(f"阶段 {stage.name} 发生错误: {str(e)}")
+        stage.record_failure()
+    finally:
+        for _ in range(consumers):
+            out_queue.put(_STOP)
+
+
+def _run_worker(stage, in_queue, out_queue):
+    """阶段工作线程：从上游队列取条目，处理后放入下游队列"""
+    while True:
+        item = in_queue.get()
+        if item is _STOP:
+            return
+        start = time.perf_counter()
+        try:
+            result = stage.func(item)
+        except Exception as e:
+            logger.error(f"阶段 {stage.name} 处理条目时发生错误: {str(e)}")
+            result = None
+        stage.record(start, time.perf_counter(), result is not None)
+        if result is not None and out_queue is not None:
+            out_queue.put(result)
+
+
+def run_stages(source, stages, queue_size=8):
+    """
+    运行流水线
+    各阶段之间通过有界队列传递条目，上游每产出一个条目下游即可开始处理
+    :param source: 数据源阶段，其 func 为无参数的生成器函数
+    :param stages: 后续阶段列表
+    :param queue_size: 阶段间队列的最大长度
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    source_thread = threading.Thread(
+        target=_run_source, args=(source.func, source, queues[0], stages[0].concurrency),
+        name=source.name, daemon=True
+    )
+    source_thread.start()
+
+    workers = []
+    for i, stage in enumerate(stages):
+        out_queue = queues[i + 1] if i + 1 < len(stages) else None
+        threads = [
+            threading.Thread(target=_run_worker, args=(stage, queues[i], out_queue),
+                             name=f"{stage.name}-{n}", daemon=True)
+            for n in range(stage.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        workers.append(threads)
+
+    # 上游阶段全部结束后，通知下游阶段的每个工作线程退出
+    source_thread.join()
+    for i, threads in enumerate(workers):
+        for thread in threads:
+            thread.join()
+        if i + 1 < len(stages):
+            for _ in range(stages[i + 1].concurrency):
+                queues[i + 1].put(_STOP)
+
+
+def log_summary(stages, total_time):
+    """将各阶段耗时统计写入日志"""
+    for stage in stages:
+        log_event(logger, f"阶段 {stage.name} 完成: {stage.processed} 个条目，失败 {stage.failed} 个",
+                  stage=stage.name, duration=stage.wall_time, outcome="summary",
+                  concurrency=stage.concurrency, processed=stage.processed,
+                  failed=stage.failed, busy_time=round(stage.busy_time, 4))
+    log_event(logger, f"流水线完成，总耗时 {total_time:.2f}秒",
+              stage="pipeline", duration=total_time, outcome="summary")
+
+
+def print_summary(stages, total_time):
+    """在控制台输出各阶段耗时统计表"""
+    print("\n" + "=" * 72)
+    print(f"{'阶段':<12}{'并发':>6}{'条目':>8}{'失败':>8}{'累计耗时(秒)':>16}{'墙钟耗时(秒)':>16}")
+    print("-" * 72)
+    for stage in stages:
+        print(f"{stage.name:<12}{stage.concurrency:>6}{stage.processed:>8}{stage.failed:>8}"
+              f"{stage.busy_time:>16.2f}{stage.wall_time:>16.2f}")
+    print("-" * 72)
+    print(f"总耗时: {total_time:.2f}秒")
+    print("=" * 72)
+
+
+def load_config(config_file):
+    """读取JSON配置文件，并与默认配置合并"""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        user_config = json.load(f)
+
+    config = dict(DEFAULT_CONFIG)
+    config['stages'] = {name: dict(opts) for name, opts in DEFAULT_CONFIG['stages'].items()}
+    for key, value in user_config.items():
+        # 以下划线开头的键作为注释，直接忽略
+        if key.startswith('_'):
+            continue
+        if key not in DEFAULT_CONFIG:
+            raise ValueError(f"未知的配置项: {key}")
+        if key == 'stages':
+            for name, opts in value.items():
+                if name not in DEFAULT_CONFIG['stages']:
+                    raise ValueError(f"未知的阶段: {name}，可选: {', '.join(DEFAULT_CONFIG['stages'])}")
+                config['stages'][name].update(opts)
+        else:
+            config[key] = value
+
+    config['queue_size'] = _positive_int(config['queue_size'], 'queue_size')
+    for name, opts in config['stages'].items():
+        opts['concurrency'] = _positive_int(opts.get('concurrency', 1), f"stages.{name}.concurrency")
+
+    # 指定选择结果时只导出已试听的文件，不需要文本与参考音频
+    if not config['selection_file']:
+        for key in ('reference_dir', 'text_file'):
+            if not config[key]:
+                raise ValueError(f"配置缺少必填项: {key}")
+    return config
+
+
+def _positive_int(value, key):
+    """校验配置值为正整数"""
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"配置项 {key} 必须是正整数: {value!r}")
+    return value
+
+
+def load_selection(selection_file):
+    """读取版本选择器保存的选择结果，每行为 文件名+版本后缀"""
+    with open(selection_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def make_export(export_dir):
+    """创建导出阶段的处理函数"""
+    def export(job):
+        if not job['audio_file'].is_file():
+            log_event(logger, f"文件不存在，无法导出: {job['audio_file']}",
+                      file=job['audio_file'], stage="export", outcome="failed",
+                      level=logging.ERROR)
+            return None
+        start_time = time.perf_counter()
+        target = export_dir / job['audio_file'].name
+        shutil.copy2(job['audio_file'], target)
+        log_event(logger, f"已导出: {target}", file=target, stage="export",
+                  duration=time.perf_counter() - start_time, outcome="success")
+        return job
+    return export
+
+
+def build_export_selected(config):
+    """
+    构建"导出选中版本"模式：不重新合成，直接从 work_dir 复制已试听过的文件到 selected_dir
+    重新合成会得到与试听时不同的音频，因此不能与合成阶段混用
+    """
+    work_dir = Path(config['work_dir'])
+    selected_dir = Path(config['selected_dir'] or Path(config['export_dir']) / "selected")
+    selection = load_selection(config['selection_file'])
+    selected_dir.mkdir(parents=True, exist_ok=True)
+
+    def selection_source():
+        for name in selection:
+            yield {'name': name, 'audio_file': work_dir / f"{name}.wav"}
+
+    source = Stage('selection', selection_source)
+    stages = [
+        Stage('export', make_export(selected_dir), config['stages']['export']['concurrency']),
+    ]
+    return source, stages
+
+
+def build_pipeline(config):
+    """根据配置构建数据源与各处理阶段"""
+    if config['selection_file']:
+        return build_export_selected(config)
+
+    # 推理在 gpt_sovits_root 下运行，传给它的路径需为绝对路径
+    gpt_sovits_root = config['gpt_sovits_root']
+    reference_dir = Path(config['reference_dir']).resolve()
+    work_dir = Path(config['work_dir']).resolve()
+    export_dir = Path(config['export_dir'])
+    list_dir = config['list_dir'] or generate_list.get_list_output_dir()
+    target_duration = float(config['target_duration'])
+    gpt_model_path = config['gpt_model_path'] or batch_inference.GPT_MODEL_PATH
+    sovits_model_path = config['sovits_model_path'] or batch_inference.SOVITS_MODEL_PATH
+
+    with open(config['text_file'], 'r', encoding='utf-8') as f:
+        texts = [line.strip() for line in f.readlines() if line.strip()]
+    reference_files = sorted(reference_dir.glob('*.wav'))
+    if len(texts) != len(reference_files):
+        raise ValueError(f"文本数量({len(texts)})与参考音频数量({len(reference_files)})不匹配")
+
+    work_dir.mkdir(parents=True, exist_ok=True)
+    export_dir.mkdir(parents=True, exist_ok=True)
+
+    def list_source():
+        """生成list文件，然后为每个参考音频产出各版本的合成任务"""
+        list_file, count = generate_list.write_list(str(reference_dir), list_dir)
+        logger.info(f"已生成list文件: {list_file}，共 {count} 个音频文件")
+        for text, ref_file in zip(texts, reference_files):
+            ref_text = batch_inference.extract_text_from_filename(ref_file)
+            for suffix in batch_inference.VERSION_SUFFIXES:
+                yield {
+                    'text': text,
+                    'ref_file': ref_file,
+                    'ref_text': ref_text,
+                    'name': f"{ref_file.stem}{suffix}",
+                }
+
+    def synthesize(job):
+        output_file = work_dir / f"{job['name']}.wav"
+        if not batch_inference.synthesize(job['text'], job['ref_file'], job['ref_text'], output_file,
+                                          gpt_model_path, sovits_model_path, cwd=gpt_sovits_root):
+            return None
+        return dict(job, audio_file=output_file)
+
+    def pad(job):
+        if not audio_padding.process_audio_file(job['audio_file'], target_duration):
+            return None
+        return job
+
+    stage_options = config['stages']
+    source = Stage('list', list_source)
+    stages = [
+        Stage('synthesis', synthesize, stage_options['synthesis']['concurrency']),
+        Stage('padding', pad, stage_options['padding']['concurrency']),
+        Stage('export', make_export(export_dir), stage_options['export']['concurrency']),
+    ]
+    return source, stages
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("用法: python pipeline/run_pipeline.py <配置文件.json>")
+        print("配置示例见 pipeline/pipeline_config.example.json")
+        print("合成需在 GPT-SoVITS 根目录下运行，请在配置中设置 gpt_sovits_root，或在该目录下执行本命令")
+        sys.exit(1)
+
+    setup_logging("pipeline", Path(__file__).parent / "logs")
+
+    try:
+        config = load_config(sys.argv[1])
+        source, stages = build_pipeline(config)
+    except (OSError, ValueError) as e:
+        logger.error(f"初始化流水线失败: {str(e)}")
+        sys.exit(1)
+
+    start_time = time.perf_counter()
+    run_stages(source, stages, queue_size=config['queue_size'])
+    all_stages = [source] + stages
+    total_time = time.perf_counter() - start_time
+    log_summary(all_stages, total_time)
+
+    # 先等待后台线程写完日志，避免与统计表在控制台上交错
+    shutdown_logging()
+    print_summary(all_stages, total_time)
+
+    if any(stage.failed for stage in all_stages):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()